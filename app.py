@@ -1,14 +1,49 @@
 from flask import Flask, request, render_template, send_file
 from werkzeug.utils import secure_filename
-from csv_profiler import CSVProfiler
+from collections import OrderedDict
+import hashlib
+import io
 import os
+import threading
 
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 ALLOWED_EXTENSIONS = {'csv'}
+ALLOWED_SUFFIXES = tuple(f'.{ext}' for ext in ALLOWED_EXTENSIONS)
+# pyplot keeps global figure state, so by default only one report is rendered at a
+# time per process; run more uvicorn workers to profile uploads in parallel.
+report_slots = threading.BoundedSemaphore(int(os.environ.get('REPORT_WORKERS', 1)))
+
+# Recently generated reports, keyed by (sha256 of the upload, filename), oldest first
+REPORT_CACHE_SIZE = 32
+REPORT_CACHE_BYTES = int(os.environ.get('REPORT_CACHE_BYTES', 64 * 1024 * 1024))
+report_cache = OrderedDict()
+report_cache_bytes = 0
+report_cache_lock = threading.Lock()
 
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return filename.lower().endswith(ALLOWED_SUFFIXES)
+
+def get_cached_report(key):
+    with report_cache_lock:
+        pdf = report_cache.get(key)
+        if pdf is not None:
+            report_cache.move_to_end(key)
+        return pdf
+
+def cache_report(key, pdf):
+    global report_cache_bytes
+    if len(pdf) > REPORT_CACHE_BYTES:
+        return
+    with report_cache_lock:
+        if key in report_cache:
+            report_cache_bytes -= len(report_cache.pop(key))
+        report_cache[key] = pdf
+        report_cache_bytes += len(pdf)
+        # Evict oldest first until both the entry and byte limits hold
+        while len(report_cache) > REPORT_CACHE_SIZE or report_cache_bytes > REPORT_CACHE_BYTES:
+            _, evicted = report_cache.popitem(last=False)
+            report_cache_bytes -= len(evicted)
 
 @app.route('/')
 def index():
@@ -16,6 +51,9 @@ def index():
 
 @app.route('/upload', methods=['POST'])
 def upload_file():
+    # Imported here so serving the index page never loads pandas/matplotlib
+    from csv_profiler import CSVProfiler
+    
     if 'file' not in request.files:
         return render_template('index.html', error="No file selected")
     
@@ -24,33 +62,31 @@ def upload_file():
         return render_template('index.html', error="Please select a valid CSV file")
     
     try:
-        # Save and process file
-        temp_dir = '/tmp'
-        os.makedirs(temp_dir, exist_ok=True)
         filename = secure_filename(file.filename)
-        file_path = os.path.join(temp_dir, filename)
-        file.save(file_path)
-        
-        # Generate report
-        profiler = CSVProfiler(file_path)
-        if not profiler.read_csv():
-            return render_template('index.html', error="Could not read the CSV file")
-            
-        report_path = profiler.generate_report(output_dir=temp_dir)
-        
-        # Return and cleanup
-        try:
-            return send_file(
-                report_path,
-                as_attachment=True,
-                download_name=f"report_{os.path.splitext(filename)[0]}.pdf"
-            )
-        finally:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-            if os.path.exists(report_path):
-                os.remove(report_path)
+        body = file.read()
+        # The report names the file, so identical bytes under another name are a miss
+        cache_key = (hashlib.sha256(body).hexdigest(), filename)
+        pdf = get_cached_report(cache_key)
         
+        if pdf is None:
+            # Profile the upload in memory and build the report in memory
+            profiler = CSVProfiler(io.BytesIO(body), name=filename)
+            if not profiler.read_csv():
+                return render_template('index.html', error="Could not read the CSV file")
+
+            report = io.BytesIO()
+            with report_slots:
+                profiler.generate_report(report)
+            pdf = report.getvalue()
+            cache_report(cache_key, pdf)
+
+        return send_file(
+            io.BytesIO(pdf),
+            mimetype='application/pdf',
+            as_attachment=True,
+            download_name=f"report_{os.path.splitext(filename)[0]}.pdf"
+        )
+
     except Exception as e:
         return render_template('index.html', error=str(e))
 
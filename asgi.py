@@ -0,0 +1,16 @@
+"""ASGI entry point for serving the Flask app from Uvicorn.
+
+Run with:
+    uvicorn asgi:asgi_app --workers $(nproc)
+"""
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+from app import application
+
+wsgi_app = WsgiToAsgi(application)
+
+async def asgi_app(scope, receive, send):
+    # Give every request its own worker thread; without a context asgiref
+    # runs all wrapped WSGI calls on one shared thread, one at a time.
+    async with ThreadSensitiveContext():
+        await wsgi_app(scope, receive, send)
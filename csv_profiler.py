@@ -1,45 +1,214 @@
 import os
+import re
+import shutil
+import tempfile
+import csv
+import mmap
+import chardet
 import pandas as pd
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from datetime import datetime
 import humanize
-from fpdf import FPDF
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import Image, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from xml.sax.saxutils import escape
 import seaborn as sns
-from typing import Dict, Any
+from typing import Dict, Any, BinaryIO, List, Optional, Union
 from scipy import stats
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import threading
+
+# Anything that isn't a letter or digit is replaced in report file names
+_UNSAFE_CHARS = re.compile(r'[\W_]')
+
+def _render_numeric_plot(ax, column: str, values: pd.Series) -> None:
+    """Draw a histogram of a numeric column."""
+    sns.histplot(data=values, bins=30, ax=ax)
+    ax.set_title(f'Distribution of {column}')
+
+def _render_categorical_plot(ax, column: str, value_counts: pd.Series) -> None:
+    """Draw a bar chart of a categorical column's top values."""
+    value_counts.plot(kind='bar', rot=45, ax=ax)
+    ax.set_title(f'Top 10 Values in {column}')
+
+def _render_plot_batch(tasks: list) -> list:
+    """Render (render_fn, column, data, path) tasks to PNGs on one reused figure."""
+    fig = Figure(figsize=(8, 4))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    paths = []
+    for render, column, data, path in tasks:
+        ax.clear()
+        render(ax, column, data)
+        fig.tight_layout()
+        fig.savefig(path)
+        paths.append(path)
+    return paths
+
+# One plot pool per process, shared by every report it generates. Each worker
+# imports the whole plotting stack, so plots render serially unless PLOT_WORKERS
+# asks for a pool
+_PLOT_WORKERS = min(int(os.environ.get('PLOT_WORKERS', 1)), os.cpu_count() or 1)
+_plot_executor = None
+_plot_executor_lock = threading.Lock()
+
+def _get_plot_executor() -> Optional[ProcessPoolExecutor]:
+    """Return the process-wide plot pool, starting it on first use."""
+    global _plot_executor
+    with _plot_executor_lock:
+        if _plot_executor is None:
+            # Never fork: the parent may be a web worker with live request threads
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            try:
+                _plot_executor = ProcessPoolExecutor(max_workers=_PLOT_WORKERS,
+                                                     mp_context=multiprocessing.get_context(method))
+            except (OSError, NotImplementedError):
+                # No process support (e.g. serverless sandboxes without /dev/shm)
+                _plot_executor = False
+        return _plot_executor or None
+
+def _render_plots(tasks: list) -> list:
+    """Render plot tasks across worker processes, returning paths in task order."""
+    global _plot_executor
+    workers = min(len(tasks), _PLOT_WORKERS)
+    executor = _get_plot_executor() if workers > 1 else None
+    if executor is None:
+        return _render_plot_batch(tasks)
+
+    # One strided batch per worker, so each process builds a single figure
+    try:
+        batches = list(executor.map(_render_plot_batch, [tasks[i::workers] for i in range(workers)]))
+    except BrokenProcessPool:
+        # A worker died; drop the pool so the next report starts a fresh one
+        with _plot_executor_lock:
+            if _plot_executor is executor:
+                _plot_executor = None
+        raise
+    paths = [None] * len(tasks)
+    for i, batch in enumerate(batches):
+        paths[i::workers] = batch
+    return paths
 
 class CSVProfiler:
-    def __init__(self, csv_path: str):
-        self.csv_path = csv_path
+    def __init__(self, csv_path: Union[str, BinaryIO], columns: Optional[List[str]] = None,
+                 name: Optional[str] = None):
+        self.csv_path = csv_path  # A file path, or a binary stream such as an upload
+        self.columns = columns  # Only these columns are parsed when given
+        self.name = name or (os.path.basename(csv_path) if isinstance(csv_path, str) else 'upload.csv')
         self.df = None
         self.stats = {}
         self.insights = {}
         
     def read_csv(self) -> bool:
-        """Read CSV file with automatic encoding detection."""
-        encodings = ['utf-8', 'utf-16', 'latin1']
-        delimiters = [',', ';', '\t']
-        
+        """Read CSV file, sniffing encoding and delimiter from the first 64 KB."""
+        is_stream = hasattr(self.csv_path, 'read')
+        try:
+            if is_stream:
+                self.csv_path.seek(0)
+                sample = self.csv_path.read(65536)
+            else:
+                with open(self.csv_path, 'rb') as f:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        sample = mm[:65536]
+        except (OSError, ValueError) as e:
+            print(f"Failed to open {self.name}: {str(e)}")
+            return False
+
+        encoding = chardet.detect(sample)['encoding'] or 'utf-8'
+        # An all-ASCII sample says nothing about the rest of the file; read it as UTF-8
+        if encoding.lower() == 'ascii':
+            encoding = 'utf-8'
+        sample_str = sample.decode(encoding, errors='ignore')
+        # Drop the trailing partial line so the sniffer only sees whole rows
+        if len(sample) == 65536 and '\n' in sample_str:
+            sample_str = sample_str[:sample_str.rindex('\n')]
+        try:
+            delimiter = csv.Sniffer().sniff(sample_str, delimiters=',;\t').delimiter
+        except csv.Error:
+            delimiter = ','
+
+        # The sniffed encoding only saw the sample, so fall back if the full read disagrees
+        encodings = [encoding] + [e for e in ('utf-8', 'latin1') if e != encoding.lower()]
         for encoding in encodings:
-            for delimiter in delimiters:
-                try:
-                    print(f"Trying encoding: {encoding}, delimiter: {delimiter}")
-                    self.df = pd.read_csv(self.csv_path, encoding=encoding, sep=delimiter)
-                    if len(self.df.columns) > 1:  # Check if we got multiple columns
-                        print(f"Successfully read CSV with {len(self.df.columns)} columns")
-                        return True
-                except Exception as e:
-                    print(f"Failed with encoding {encoding}, delimiter {delimiter}: {str(e)}")
+            try:
+                print(f"Reading with encoding: {encoding}, delimiter: {delimiter!r}")
+                # Pre-scan a slice of rows to find repetitive text columns worth storing as categories
+                if is_stream:
+                    self.csv_path.seek(0)
+                head = pd.read_csv(self.csv_path, encoding=encoding, sep=delimiter,
+                                   usecols=self.columns, nrows=1000)
+                dtype_map = {c: 'category' for c in head.columns
+                             if head[c].dtype == object and len(head) and head[c].nunique() / len(head) < 0.5}
+                if is_stream:
+                    self.csv_path.seek(0)
+                # pandas < 1.3 hands memory-mapped bytes to the parser undecoded, so only
+                # map files that are already UTF-8
+                memory_map = not is_stream and encoding.lower() == 'utf-8'
+                self.df = pd.read_csv(self.csv_path, encoding=encoding, sep=delimiter, usecols=self.columns,
+                                      dtype=dtype_map, memory_map=memory_map, engine='c', low_memory=False)
+                break
+            except UnicodeDecodeError as e:
+                print(f"Failed with encoding {encoding}, delimiter {delimiter!r}: {str(e)}")
+            except Exception as e:
+                print(f"Failed with encoding {encoding}, delimiter {delimiter!r}: {str(e)}")
+                return False
+        else:
+            return False
+
+        # Check if we got multiple columns, unless the caller asked for fewer
+        if self.columns is not None or len(self.df.columns) > 1:
+            print(f"Successfully read CSV with {len(self.df.columns)} columns")
+            self._downcast_numeric()
+            return True
         return False
 
+    def _downcast_numeric(self) -> None:
+        """Shrink integer columns to the smallest dtype that holds their values."""
+        # Floats stay float64: float32 would leak into the printed statistics
+        for c in self.df.select_dtypes(include=['int64']).columns:
+            self.df[c] = pd.to_numeric(self.df[c], downcast='integer')
+
+    def _source_size(self) -> int:
+        """Size in bytes of the input file or stream."""
+        if hasattr(self.csv_path, 'read'):
+            return self.csv_path.seek(0, os.SEEK_END)
+        return os.path.getsize(self.csv_path)
+
+    def _top_values(self, column: str, n: int = 10) -> pd.Series:
+        """Count the n most frequent values of a non-numeric column."""
+        series = self.df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Categoricals already count with a bincount over their codes
+            return series.value_counts().head(n)
+        
+        codes, uniques = pd.factorize(series)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        # Keep every value tied with the n-th largest count, then order the survivors
+        if len(counts) > n:
+            kth = np.partition(counts, len(counts) - n)[len(counts) - n]
+            candidates = np.flatnonzero(counts >= kth)
+        else:
+            candidates = np.arange(len(counts))
+        top = candidates[np.argsort(-counts[candidates], kind='stable')][:n]
+        return pd.Series(counts[top], index=uniques[top], name='count')
+
     def _analyze_correlations(self) -> Dict:
         """Analyze correlations between numeric columns."""
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns
+        numeric_cols = self._num_cols
         if len(numeric_cols) > 1:
             corr_matrix = self.df[numeric_cols].corr()
+            self._corr_matrix = corr_matrix
             
             # Find strong correlations
             strong_correlations = []
@@ -53,52 +222,50 @@ class CSVProfiler:
                             'correlation': corr
                         })
             
-            # Create correlation heatmap
-            plt.figure(figsize=(10, 8))
-            sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', center=0)
-            plt.title('Correlation Heatmap')
-            plt.tight_layout()
-            heatmap_path = 'correlation_heatmap.png'
-            plt.savefig(heatmap_path)
-            plt.close()
-            
-            return {
-                'strong_correlations': strong_correlations,
-                'heatmap_path': heatmap_path
-            }
+            return {'strong_correlations': strong_correlations}
         return None
 
     def _identify_primary_keys(self) -> list:
         """Identify potential primary key columns."""
-        primary_keys = []
-        for column in self.df.columns:
-            if self.df[column].nunique() == len(self.df) and self.df[column].notna().all():
-                primary_keys.append(column)
-        return primary_keys
+        mask = (self._nunique_per_col == len(self.df)) & (self._nan_per_col == 0)
+        return self.df.columns[mask.to_numpy()].tolist()
 
     def _analyze_trends(self) -> Dict:
         """Analyze trends in numeric columns."""
         trends = {}
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns
+        if len(self._num_cols) == 0:
+            return trends
         
-        for col in numeric_cols:
-            series = self.df[col].dropna()
-            if len(series) > 1:
-                # Basic trend analysis
-                trend = 'increasing' if series.corr(pd.Series(range(len(series)))) > 0.5 else \
-                       'decreasing' if series.corr(pd.Series(range(len(series)))) < -0.5 else \
-                       'stable'
-                
+        # Correlate every column with its row position in one pass, skipping NaNs per column
+        values = self.df[self._num_cols].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        counts = valid.sum(axis=0)
+        idx = np.arange(len(values), dtype=np.float64)[:, None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            x = np.where(valid, idx - (idx * valid).sum(axis=0) / counts, 0.0)
+            y = np.where(valid, values, 0.0)
+            y = np.where(valid, y - y.sum(axis=0) / counts, 0.0)
+            trend_corr = (x * y).sum(axis=0) / np.sqrt((x * x).sum(axis=0) * (y * y).sum(axis=0))
+            
+            # Bias-adjusted sample skewness, matching Series.skew()
+            m2 = (y ** 2).sum(axis=0) / counts
+            m3 = (y ** 3).sum(axis=0) / counts
+            skewness = np.sqrt(counts * (counts - 1)) / (counts - 2) * m3 / m2 ** 1.5
+        skewness = np.where(counts < 3, np.nan, np.where(m2 == 0, 0.0, skewness))
+        
+        trend_labels = np.where(trend_corr > 0.5, 'increasing',
+                                np.where(trend_corr < -0.5, 'decreasing', 'stable'))
+        for col, n, trend, skew in zip(self._num_cols, counts, trend_labels, skewness):
+            if n > 1:
                 # Distribution analysis
-                skewness = series.skew()
-                distribution = 'normal' if abs(skewness) < 0.5 else \
-                             'right-skewed' if skewness > 0.5 else \
+                distribution = 'normal' if abs(skew) < 0.5 else \
+                             'right-skewed' if skew > 0.5 else \
                              'left-skewed'
                 
                 trends[col] = {
-                    'trend': trend,
+                    'trend': str(trend),
                     'distribution': distribution,
-                    'skewness': skewness
+                    'skewness': skew
                 }
         return trends
 
@@ -112,10 +279,10 @@ class CSVProfiler:
         }
         
         # Analyze data quality
-        total_missing = self.df.isna().sum().sum()
+        total_missing = self._nan_per_col.sum()
         total_cells = self.df.size
         data_quality = (1 - total_missing/total_cells) * 100
-        missing_columns = self.df.columns[self.df.isna().any()].tolist()
+        missing_columns = self.df.columns[self._nan_per_col > 0].tolist()
         
         # Data Quality insights
         insights['key_findings'].extend([
@@ -125,7 +292,7 @@ class CSVProfiler:
         
         # Primary Key insights
         if insights['primary_keys']:
-            unique_counts = [f"{key} ({self.df[key].nunique():,} unique values)" for key in insights['primary_keys']]
+            unique_counts = [f"{key} ({self._nunique_per_col[key]:,} unique values)" for key in insights['primary_keys']]
             insights['key_findings'].append(
                 f"Primary Key Analysis:\nIdentified {len(insights['primary_keys'])} potential primary key(s): {', '.join(unique_counts)}. These columns have unique values for each record and can be used as reliable identifiers."
             )
@@ -143,8 +310,8 @@ class CSVProfiler:
         # Trend and Distribution insights
         for col, trend_info in insights['trends'].items():
             if trend_info['trend'] != 'stable':
-                mean_val = self.df[col].mean()
-                std_val = self.df[col].std()
+                mean_val = self._desc.at['mean', col]
+                std_val = self._desc.at['std', col]
                 insights['key_findings'].append(
                     f"Trend Analysis for {col}:\n"
                     f"Shows a {trend_info['trend']} trend with {trend_info['distribution']} distribution. "
@@ -152,8 +319,8 @@ class CSVProfiler:
                 )
         
         # Add data type distribution insight
-        numeric_cols = len(self.df.select_dtypes(include=[np.number]).columns)
-        categorical_cols = len(self.df.select_dtypes(exclude=[np.number]).columns)
+        numeric_cols = len(self._num_cols)
+        categorical_cols = len(self.df.columns) - numeric_cols
         insights['key_findings'].append(
             f"Data Type Distribution:\n"
             f"The dataset contains {numeric_cols} numeric columns and {categorical_cols} categorical columns, "
@@ -161,16 +328,17 @@ class CSVProfiler:
         )
         
         # Add outlier detection insight if applicable
-        numeric_columns = self.df.select_dtypes(include=[np.number]).columns
-        if len(numeric_columns) > 0:
-            outlier_info = []
-            for col in numeric_columns:
-                q1 = self.df[col].quantile(0.25)
-                q3 = self.df[col].quantile(0.75)
-                iqr = q3 - q1
-                outliers = ((self.df[col] < (q1 - 1.5 * iqr)) | (self.df[col] > (q3 + 1.5 * iqr))).sum()
-                if outliers > 0:
-                    outlier_info.append(f"{col} ({outliers} outliers)")
+        if len(self._num_cols) > 0:
+            # Quartiles come from the cached describe(); one broadcast compare covers every column
+            values = self.df[self._num_cols].to_numpy(dtype=np.float64)
+            q1 = self._desc.loc['25%', self._num_cols].to_numpy(dtype=np.float64)
+            q3 = self._desc.loc['75%', self._num_cols].to_numpy(dtype=np.float64)
+            iqr = q3 - q1
+            with np.errstate(invalid='ignore'):
+                mask = (values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)
+            outlier_counts = mask.sum(axis=0)
+            outlier_info = [f"{col} ({outliers} outliers)"
+                            for col, outliers in zip(self._num_cols, outlier_counts) if outliers > 0]
             
             if outlier_info:
                 insights['key_findings'].append(
@@ -181,20 +349,30 @@ class CSVProfiler:
         
         return insights
 
-    def analyze(self) -> bool:
-        """Analyze the CSV file and generate statistics."""
+    def analyze(self, plot_dir: Optional[str] = None) -> bool:
+        """Analyze the CSV file and generate statistics.
+
+        Plots are only rendered when ``plot_dir`` is given; the caller owns that
+        directory and is responsible for removing it.
+        """
         try:
-            # Read the file
-            if not self.read_csv():
+            # Read the file, unless the caller already has
+            if self.df is None and not self.read_csv():
                 return False
             
+            # Column summaries shared by every statistic below, one scan each
+            self._num_cols = self.df.select_dtypes(include=[np.number]).columns
+            self._desc = self.df[self._num_cols].describe() if len(self._num_cols) else pd.DataFrame()
+            self._nan_per_col = self.df.isna().sum()
+            self._nunique_per_col = self.df.nunique()
+            
             # File level statistics
             file_stats = {
-                'filename': os.path.basename(self.csv_path),
-                'file_size': humanize.naturalsize(os.path.getsize(self.csv_path)),
+                'filename': self.name,
+                'file_size': humanize.naturalsize(self._source_size()),
                 'rows': len(self.df),
                 'columns': len(self.df.columns),
-                'missing_cells': self.df.isna().sum().sum(),
+                'missing_cells': self._nan_per_col.sum(),
                 'duplicate_rows': self.df.duplicated().sum()
             }
             
@@ -206,45 +384,29 @@ class CSVProfiler:
             for column in self.df.columns:
                 stats = {
                     'type': str(self.df[column].dtype),
-                    'missing': self.df[column].isna().sum(),
-                    'unique': self.df[column].nunique(),
+                    'missing': self._nan_per_col[column],
+                    'unique': self._nunique_per_col[column],
                 }
                 
                 # Numeric column statistics
-                if np.issubdtype(self.df[column].dtype, np.number):
+                if column in self._desc.columns:
+                    desc = self._desc[column]
                     stats.update({
-                        'mean': self.df[column].mean(),
-                        'std': self.df[column].std(),
-                        'min': self.df[column].min(),
-                        'max': self.df[column].max(),
-                        '25%': self.df[column].quantile(0.25),
-                        '50%': self.df[column].quantile(0.50),
-                        '75%': self.df[column].quantile(0.75)
+                        'mean': desc['mean'],
+                        'std': desc['std'],
+                        'min': desc['min'],
+                        'max': desc['max'],
+                        '25%': desc['25%'],
+                        '50%': desc['50%'],
+                        '75%': desc['75%']
                     })
-                    
-                    # Create distribution plot
-                    plt.figure(figsize=(8, 4))
-                    sns.histplot(data=self.df[column].dropna(), bins=30)
-                    plt.title(f'Distribution of {column}')
-                    plt.savefig(f'temp_{column}_dist.png')
-                    plt.close()
-                    stats['plot'] = f'temp_{column}_dist.png'
+                    # describe() reports everything as float; keep integer bounds integral
+                    if np.issubdtype(self.df[column].dtype, np.integer):
+                        stats['min'], stats['max'] = int(desc['min']), int(desc['max'])
                 
                 # Categorical column statistics
                 else:
-                    value_counts = self.df[column].value_counts()
-                    stats['top_values'] = value_counts.head(10).to_dict()
-                    
-                    # Create bar plot for categorical data
-                    if len(value_counts) <= 20:  # Only plot if not too many categories
-                        plt.figure(figsize=(8, 4))
-                        value_counts.head(10).plot(kind='bar')
-                        plt.title(f'Top 10 Values in {column}')
-                        plt.xticks(rotation=45)
-                        plt.tight_layout()
-                        plt.savefig(f'temp_{column}_dist.png')
-                        plt.close()
-                        stats['plot'] = f'temp_{column}_dist.png'
+                    stats['top_values'] = self._top_values(column).to_dict()
                 
                 column_stats[column] = stats
             
@@ -252,153 +414,189 @@ class CSVProfiler:
                 'file_stats': file_stats,
                 'column_stats': column_stats
             }
+            
+            if plot_dir:
+                self._render_report_plots(plot_dir)
             return True
             
         except Exception as e:
             print(f"Error analyzing file: {str(e)}")
             return False
 
-    def generate_report(self, output_dir: str = "/tmp/output") -> str:
-        """Generate PDF report with the analysis results."""
-        if not self.stats:
-            if not self.analyze():
-                raise Exception("Analysis failed")
+    def _render_report_plots(self, plot_dir: str) -> None:
+        """Render the heatmap and column plots of the current analysis into plot_dir."""
+        # Create correlation heatmap
+        if self.insights['correlations']:
+            plt.figure(figsize=(10, 8))
+            sns.heatmap(self._corr_matrix, annot=True, cmap='coolwarm', center=0)
+            plt.title('Correlation Heatmap')
+            plt.tight_layout()
+            heatmap_path = os.path.join(plot_dir, 'correlation_heatmap.png')
+            plt.savefig(heatmap_path)
+            plt.close()
+            self.insights['correlations']['heatmap_path'] = heatmap_path
         
+        plot_tasks = []
+        for i, (column, stats) in enumerate(self.stats['column_stats'].items()):
+            plot_path = os.path.join(plot_dir, f'column_{i}_dist.png')
+            # Create distribution plot
+            if 'mean' in stats:
+                plot_tasks.append((_render_numeric_plot, column, self.df[column].dropna(), plot_path))
+            # Create bar plot for categorical data
+            elif stats['unique'] <= 20:  # Only plot if not too many categories
+                top_values = pd.Series(stats['top_values'], dtype='int64')
+                plot_tasks.append((_render_categorical_plot, column, top_values, plot_path))
+        
+        for column, plot_path in zip([task[1] for task in plot_tasks], _render_plots(plot_tasks)):
+            self.stats['column_stats'][column]['plot'] = plot_path
+
+    def generate_report(self, output: Union[str, BinaryIO] = "/tmp/output") -> Union[str, BinaryIO]:
+        """Generate PDF report with the analysis results.
+
+        ``output`` is either a directory to save the report under, or a binary
+        file-like object the PDF bytes are written to. An earlier ``analyze()``
+        result is reused; only its plots are rendered again.
+        """
         # Get base filename without extension
-        base_filename = os.path.splitext(os.path.basename(self.csv_path))[0]
+        base_filename = os.path.splitext(self.name)[0]
         # Clean filename (remove special characters)
-        clean_filename = "".join(c if c.isalnum() else "_" for c in base_filename).strip("_")
-        
-        # Create project-specific directory in output
-        project_dir = os.path.join(output_dir, clean_filename)
-        os.makedirs(project_dir, exist_ok=True)
+        clean_filename = _UNSAFE_CHARS.sub("_", base_filename).strip("_")
         
         # Create a temporary directory for plots
-        import tempfile
         temp_dir = tempfile.mkdtemp(prefix='csv_profiler_')
         
         try:
-            # Initialize PDF
-            pdf = FPDF()
-            pdf.set_margins(10, 10, 10)  # Set left, top, right margins
-            pdf.add_page()
+            # Analyze with plots rendered into the scratch directory, unless the
+            # caller already has
+            if self.stats:
+                self._render_report_plots(temp_dir)
+            elif not self.analyze(plot_dir=temp_dir):
+                raise Exception("Analysis failed")
+            
+            styles = getSampleStyleSheet()
+            title_style = ParagraphStyle('ReportTitle', parent=styles['Title'], fontSize=16)
+            section_style = ParagraphStyle('Section', parent=styles['Heading2'], fontSize=14)
+            subsection_style = ParagraphStyle('Subsection', parent=styles['Heading3'], fontSize=12)
+            label_style = ParagraphStyle('Label', parent=styles['Normal'], fontName='Helvetica-Bold',
+                                         fontSize=10, spaceBefore=8, spaceAfter=2)
+            key_style = ParagraphStyle('PrimaryKey', parent=label_style, textColor=colors.green, spaceBefore=0)
+            body_style = ParagraphStyle('Body', parent=styles['Normal'], fontSize=10, leading=14)
+            finding_style = ParagraphStyle('Finding', parent=body_style, leftIndent=5 * mm, spaceAfter=6)
+            
+            if hasattr(output, 'write'):
+                destination = output
+            else:
+                # Create project-specific directory in output
+                project_dir = os.path.join(output, clean_filename)
+                os.makedirs(project_dir, exist_ok=True)
+                
+                # Save the report with a clean name
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M")
+                report_name = f"{clean_filename}_profile_report_{timestamp}.pdf"
+                destination = os.path.join(project_dir, report_name)
+            
+            doc = SimpleDocTemplate(destination, pagesize=A4, leftMargin=10 * mm, rightMargin=10 * mm,
+                                    topMargin=10 * mm, bottomMargin=10 * mm, title='CSV Profile Report')
+            
+            def text(value) -> str:
+                return escape(str(value)).replace('\n', '<br/>')
+            
+            def cell(value) -> Paragraph:
+                # Table rows can't split across pages, so keep each cell to one short line
+                value = ' '.join(str(value).split())
+                if len(value) > 200:
+                    value = value[:197] + '...'
+                return Paragraph(escape(value), body_style)
+            
+            def stat_table(rows) -> Table:
+                table = Table([[cell(label), cell(value)] for label, value in rows],
+                              colWidths=[45 * mm, doc.width - 45 * mm], hAlign='LEFT')
+                table.setStyle(TableStyle([
+                    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+                    ('LEFTPADDING', (0, 0), (-1, -1), 0),
+                    ('TOPPADDING', (0, 0), (-1, -1), 1),
+                    ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+                ]))
+                return table
+            
+            def image(path: str) -> Image:
+                img_width, img_height = ImageReader(path).getSize()
+                return Image(path, width=doc.width, height=doc.width * img_height / img_width)
             
             # Title
-            pdf.set_font('Arial', 'B', 16)
-            pdf.cell(0, 10, 'CSV Profile Report', ln=True, align='C')
-            pdf.ln(10)
+            story = [Paragraph('CSV Profile Report', title_style)]
             
             # AI Insights Section
-            pdf.set_font('Arial', 'B', 14)
-            pdf.cell(0, 10, 'AI-Driven Insights', ln=True)
-            pdf.set_font('Arial', '', 10)
+            story.append(Paragraph('AI-Driven Insights', section_style))
             
             # Key Findings
-            pdf.ln(5)
-            pdf.set_font('Arial', 'B', 12)
-            pdf.cell(0, 8, 'Key Findings:', ln=True)
-            pdf.set_font('Arial', '', 10)
+            story.append(Paragraph('Key Findings:', subsection_style))
             for finding in self.insights['key_findings']:
-                pdf.set_x(15)  # Indent the findings
-                pdf.multi_cell(180, 8, f"- {finding}")
+                story.append(Paragraph(f"- {text(finding)}", finding_style))
             
             # Correlation Heatmap
             if self.insights['correlations'] and 'heatmap_path' in self.insights['correlations']:
-                heatmap_path = os.path.join(temp_dir, 'correlation_heatmap.png')
-                plt.figure(figsize=(10, 8))
-                sns.heatmap(self.df[self.df.select_dtypes(include=[np.number]).columns].corr(), 
-                           annot=True, cmap='coolwarm', center=0)
-                plt.title('Correlation Heatmap')
-                plt.tight_layout()
-                plt.savefig(heatmap_path)
-                plt.close()
-                
-                pdf.add_page()
-                pdf.set_font('Arial', 'B', 12)
-                pdf.cell(0, 10, 'Correlation Analysis:', ln=True)
-                pdf.image(heatmap_path, x=10, y=None, w=190)
+                story += [PageBreak(),
+                          Paragraph('Correlation Analysis:', subsection_style),
+                          image(self.insights['correlations']['heatmap_path'])]
             
             # File Statistics
-            pdf.add_page()
-            pdf.set_font('Arial', 'B', 14)
-            pdf.cell(0, 10, 'File Overview', ln=True)
-            pdf.set_font('Arial', '', 10)
-            
+            story += [PageBreak(), Paragraph('File Overview', section_style)]
             file_stats = self.stats['file_stats']
-            for key, value in file_stats.items():
-                pdf.cell(0, 8, f"{key.replace('_', ' ').title()}: {value}", ln=True)
+            story.append(stat_table([(f"{key.replace('_', ' ').title()}:", value)
+                                     for key, value in file_stats.items()]))
             
             # Column Analysis
-            pdf.add_page()
-            pdf.set_font('Arial', 'B', 14)
-            pdf.cell(0, 10, 'Column Analysis', ln=True)
+            story += [PageBreak(), Paragraph('Column Analysis', section_style)]
             
             for column, stats in self.stats['column_stats'].items():
-                pdf.add_page()
-                pdf.set_font('Arial', 'B', 12)
-                pdf.cell(0, 10, f"Column: {column}", ln=True)
+                story += [PageBreak(), Paragraph(f"Column: {text(column)}", subsection_style)]
                 
                 # Add primary key indicator
                 if column in self.insights['primary_keys']:
-                    pdf.set_font('Arial', 'B', 10)
-                    pdf.set_text_color(0, 128, 0)  # Green color
-                    pdf.cell(0, 8, "Potential Primary Key", ln=True)
-                    pdf.set_text_color(0, 0, 0)  # Reset to black
+                    story.append(Paragraph("Potential Primary Key", key_style))
                 
-                pdf.set_font('Arial', '', 10)
                 # Basic stats
-                pdf.cell(0, 8, f"Type: {stats['type']}", ln=True)
-                pdf.cell(0, 8, f"Missing Values: {stats['missing']}", ln=True)
-                pdf.cell(0, 8, f"Unique Values: {stats['unique']}", ln=True)
+                rows = [
+                    ("Type:", stats['type']),
+                    ("Missing Values:", stats['missing']),
+                    ("Unique Values:", stats['unique']),
+                ]
                 
                 # Numeric stats
                 if 'mean' in stats:
-                    pdf.cell(0, 8, f"Mean: {stats['mean']:.2f}", ln=True)
-                    pdf.cell(0, 8, f"Standard Deviation: {stats['std']:.2f}", ln=True)
-                    pdf.cell(0, 8, f"Min: {stats['min']}", ln=True)
-                    pdf.cell(0, 8, f"Max: {stats['max']}", ln=True)
-                    pdf.cell(0, 8, f"25th Percentile: {stats['25%']:.2f}", ln=True)
-                    pdf.cell(0, 8, f"Median: {stats['50%']:.2f}", ln=True)
-                    pdf.cell(0, 8, f"75th Percentile: {stats['75%']:.2f}", ln=True)
-                    
-                    # Add trend information if available
-                    if column in self.insights['trends']:
-                        trend_info = self.insights['trends'][column]
-                        pdf.ln(5)
-                        pdf.set_font('Arial', 'B', 10)
-                        pdf.cell(0, 8, "Trend Analysis:", ln=True)
-                        pdf.set_font('Arial', '', 10)
-                        pdf.cell(0, 8, f"Trend: {trend_info['trend'].title()}", ln=True)
-                        pdf.cell(0, 8, f"Distribution: {trend_info['distribution'].title()}", ln=True)
+                    rows += [
+                        ("Mean:", f"{stats['mean']:.2f}"),
+                        ("Standard Deviation:", f"{stats['std']:.2f}"),
+                        ("Min:", stats['min']),
+                        ("Max:", stats['max']),
+                        ("25th Percentile:", f"{stats['25%']:.2f}"),
+                        ("Median:", f"{stats['50%']:.2f}"),
+                        ("75th Percentile:", f"{stats['75%']:.2f}"),
+                    ]
+                story.append(stat_table(rows))
+                
+                # Add trend information if available
+                if 'mean' in stats and column in self.insights['trends']:
+                    trend_info = self.insights['trends'][column]
+                    story += [Paragraph("Trend Analysis:", label_style),
+                              stat_table([("Trend:", trend_info['trend'].title()),
+                                          ("Distribution:", trend_info['distribution'].title())])]
                 
                 # Categorical stats
                 if 'top_values' in stats:
-                    pdf.ln(5)
-                    pdf.set_font('Arial', 'B', 10)
-                    pdf.cell(0, 8, "Top Values:", ln=True)
-                    pdf.set_font('Arial', '', 10)
-                    for val, count in stats['top_values'].items():
-                        pdf.cell(0, 8, f"{val}: {count}", ln=True)
+                    story += [Paragraph("Top Values:", label_style),
+                              stat_table([(f"{val}:", count) for val, count in stats['top_values'].items()])]
                 
                 # Add plot if available
                 if 'plot' in stats:
-                    # Save plots in the project directory
-                    plot_path = os.path.join(project_dir, f'plot_{column}.png')
-                    os.rename(stats['plot'], plot_path)
-                    pdf.image(plot_path, x=10, y=None, w=190)
-                    os.remove(plot_path)  # Clean up
-            
-            # Save the report with a clean name
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-            report_name = f"{clean_filename}_profile_report_{timestamp}.pdf"
-            output_file = os.path.join(project_dir, report_name)
-            pdf.output(output_file)
+                    story += [Spacer(1, 4 * mm), image(stats['plot'])]
             
-            return output_file
+            doc.build(story)
+            return destination
             
         finally:
             # Clean up temporary files
-            import shutil
             shutil.rmtree(temp_dir, ignore_errors=True)
 
 if __name__ == "__main__":